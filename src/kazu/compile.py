@@ -1,5 +1,6 @@
-from functools import lru_cache
-from typing import Callable, List, Tuple, TypeVar, Optional
+from functools import lru_cache, partial
+from itertools import chain
+from typing import Callable, Dict, List, Tuple, TypeVar, Optional
 
 from mentabotix import (
     MovingChainComposer,
@@ -33,6 +34,204 @@ composer = MovingChainComposer()
 
 T = TypeVar("T")
 
+# <editor-fold desc="Context Keys">
+# resolve the context variable names once, instead of going through the enum on every use
+_RECORDED_PACK_KEY: str = ContextVar.recorded_pack.name
+_GRADIENT_SPEED_KEY: str = ContextVar.gradient_speed.name
+_PREV_SALVO_SPEED_KEY: str = ContextVar.prev_salvo_speed.name
+_UNCLEAR_ZONE_GRAY_KEY: str = ContextVar.unclear_zone_gray.name
+# </editor-fold>
+
+# <editor-fold desc="Surrounding Case Groups">
+# the codes sharing the same reaction in the surrounding handler
+_FRONT_ENEMY_CAR_CODES: Tuple[SurroundingCodeSign, ...] = (
+    SurroundingCodeSign.FRONT_ENEMY_CAR,
+    SurroundingCodeSign.FRONT_ENEMY_CAR_RIGHT_OBJECT,
+    SurroundingCodeSign.FRONT_ENEMY_CAR_LEFT_OBJECT,
+    SurroundingCodeSign.FRONT_ENEMY_CAR_BEHIND_OBJECT,
+    SurroundingCodeSign.FRONT_ENEMY_CAR_LEFT_RIGHT_OBJECTS,
+    SurroundingCodeSign.FRONT_ENEMY_CAR_RIGHT_BEHIND_OBJECTS,
+    SurroundingCodeSign.FRONT_ENEMY_CAR_LEFT_BEHIND_OBJECTS,
+    SurroundingCodeSign.FRONT_ENEMY_CAR_LEFT_RIGHT_BEHIND_OBJECTS,
+)
+
+_BEHIND_CODES: Tuple[SurroundingCodeSign, ...] = (
+    SurroundingCodeSign.BEHIND_OBJECT,
+    SurroundingCodeSign.LEFT_RIGHT_BEHIND_OBJECTS,
+    SurroundingCodeSign.FRONT_ENEMY_BOX_BEHIND_OBJECT,
+    SurroundingCodeSign.FRONT_ALLY_BOX_BEHIND_OBJECT,
+    SurroundingCodeSign.FRONT_NEUTRAL_BOX_BEHIND_OBJECT,
+    SurroundingCodeSign.FRONT_ALLY_BOX_LEFT_RIGHT_BEHIND_OBJECTS,
+    SurroundingCodeSign.FRONT_NEUTRAL_BOX_LEFT_RIGHT_BEHIND_OBJECTS,
+    SurroundingCodeSign.FRONT_ENEMY_BOX_LEFT_RIGHT_BEHIND_OBJECTS,
+)
+
+_LEFT_CODES: Tuple[SurroundingCodeSign, ...] = (
+    SurroundingCodeSign.LEFT_OBJECT,
+    SurroundingCodeSign.FRONT_ENEMY_BOX_LEFT_OBJECT,
+    SurroundingCodeSign.FRONT_ALLY_BOX_LEFT_OBJECT,
+    SurroundingCodeSign.FRONT_NEUTRAL_BOX_LEFT_OBJECT,
+)
+
+_RIGHT_CODES: Tuple[SurroundingCodeSign, ...] = (
+    SurroundingCodeSign.RIGHT_OBJECT,
+    SurroundingCodeSign.FRONT_ENEMY_BOX_RIGHT_OBJECT,
+    SurroundingCodeSign.FRONT_ALLY_BOX_RIGHT_OBJECT,
+    SurroundingCodeSign.FRONT_NEUTRAL_BOX_RIGHT_OBJECT,
+)
+
+_LEFT_RIGHT_CODES: Tuple[SurroundingCodeSign, ...] = (
+    SurroundingCodeSign.LEFT_RIGHT_OBJECTS,
+    SurroundingCodeSign.FRONT_ENEMY_BOX_LEFT_RIGHT_OBJECTS,
+    SurroundingCodeSign.FRONT_ALLY_BOX_LEFT_RIGHT_OBJECTS,
+    SurroundingCodeSign.FRONT_NEUTRAL_BOX_LEFT_RIGHT_OBJECTS,
+)
+
+_LEFT_BEHIND_CODES: Tuple[SurroundingCodeSign, ...] = (
+    SurroundingCodeSign.LEFT_BEHIND_OBJECTS,
+    SurroundingCodeSign.FRONT_ENEMY_BOX_LEFT_BEHIND_OBJECTS,
+    SurroundingCodeSign.FRONT_ALLY_BOX_LEFT_BEHIND_OBJECTS,
+    SurroundingCodeSign.FRONT_NEUTRAL_BOX_LEFT_BEHIND_OBJECTS,
+)
+
+_RIGHT_BEHIND_CODES: Tuple[SurroundingCodeSign, ...] = (
+    SurroundingCodeSign.RIGHT_BEHIND_OBJECTS,
+    SurroundingCodeSign.FRONT_ENEMY_BOX_RIGHT_BEHIND_OBJECTS,
+    SurroundingCodeSign.FRONT_ALLY_BOX_RIGHT_BEHIND_OBJECTS,
+    SurroundingCodeSign.FRONT_NEUTRAL_BOX_RIGHT_BEHIND_OBJECTS,
+)
+# </editor-fold>
+
+# <editor-fold desc="Scan Case Groups">
+# the codes sharing the same reaction in the scan handler
+_SCAN_FALL_BACK_CODES: Tuple[ScanCodesign, ...] = (ScanCodesign.X_O_O_O, ScanCodesign.X_O_X_X)
+
+_SCAN_RAND_TURN_CODES: Tuple[ScanCodesign, ...] = (
+    ScanCodesign.X_X_X_X,
+    ScanCodesign.X_X_X_O,
+    ScanCodesign.X_X_O_X,
+    ScanCodesign.O_X_X_X,
+    ScanCodesign.X_X_O_O,
+    ScanCodesign.O_X_X_O,
+    ScanCodesign.O_X_O_X,
+    ScanCodesign.O_X_O_O,
+)
+
+_SCAN_TURN_LEFT_CODES: Tuple[ScanCodesign, ...] = (ScanCodesign.O_O_X_O, ScanCodesign.X_O_X_O)
+
+_SCAN_TURN_RIGHT_CODES: Tuple[ScanCodesign, ...] = (ScanCodesign.O_O_O_X, ScanCodesign.X_O_O_X)
+# </editor-fold>
+
+# <editor-fold desc="Fence Case Groups">
+# the codes sharing the same reaction in the fence handler
+_FENCE_ALIGN_STAGE_CODES: Tuple[FenceCodeSign, ...] = (
+    FenceCodeSign.O_X_O_O,
+    FenceCodeSign.O_O_X_O,
+    FenceCodeSign.O_O_O_X,
+    FenceCodeSign.O_O_X_X,
+    FenceCodeSign.X_X_O_O,
+)
+
+_FENCE_FRONT_EXIT_CODES: Tuple[FenceCodeSign, ...] = (FenceCodeSign.O_X_O_X, FenceCodeSign.O_X_X_O)
+
+_FENCE_REAR_EXIT_CODES: Tuple[FenceCodeSign, ...] = (FenceCodeSign.X_O_O_X, FenceCodeSign.X_O_X_O)
+
+_FENCE_ALIGN_DIRECTION_CODES: Tuple[FenceCodeSign, ...] = (
+    FenceCodeSign.O_X_X_X,
+    FenceCodeSign.X_O_X_X,
+    FenceCodeSign.X_X_O_X,
+    FenceCodeSign.X_X_X_O,
+)
+
+_FENCE_RAND_MOVE_CODES: Tuple[FenceCodeSign, ...] = (FenceCodeSign.O_O_O_O, FenceCodeSign.X_X_X_X)
+# </editor-fold>
+
+
+def _build_chain(*units: MovingState | MovingTransition) -> Tuple[List[MovingState], List[MovingTransition]]:
+    """
+    Build a branchless chain with the module composer in a single pass.
+
+    Args:
+        *units (MovingState | MovingTransition): the states and transitions of the chain, in order.
+
+    Returns:
+        Tuple[List[MovingState], List[MovingTransition]]: the states and the transitions of the chain.
+    """
+    composer.init_container()
+    for unit in units:
+        composer.add(unit)
+    return composer.export_structure()
+
+
+def _broadcast_speed(speed: int) -> Tuple[int, int, int, int]:
+    """
+    Broadcast a single speed to all the four wheels.
+    """
+    return speed, speed, speed, speed
+
+
+_ZERO4: Tuple[int, int, int, int] = (0, 0, 0, 0)
+
+
+def _zero_salvo_speed_updater() -> Tuple[int, int, int, int]:
+    """
+    Reset the recorded salvo speed, shared by all the salvo end states.
+    """
+    return _ZERO4
+
+
+@lru_cache(maxsize=None)
+def _context_executor(
+    function: Callable[..., T],
+    output_keys: str | Tuple[str, ...] = (),
+    input_keys: str | Tuple[str, ...] = (),
+    function_name: str = "_executor",
+) -> Callable[[], None]:
+    """
+    Register a context executor on the controller only once.
+
+    The controller generates a new executor on every registration, while the executors of the same function and keys
+    are interchangeable, so the rebuilt handlers reuse the cached one.
+
+    Args:
+        function (Callable[..., T]): The function whose output is dumped to the context.
+        output_keys (str | Tuple[str, ...]): The context keys to store the output, must be hashable.
+        input_keys (str | Tuple[str, ...]): The context keys to feed the function, must be hashable.
+        function_name (str): The name of the generated executor.
+
+    Returns:
+        Callable[[], None]: The registered executor.
+    """
+    return controller.register_context_executor(
+        function, output_keys=output_keys, input_keys=input_keys, function_name=function_name
+    )
+
+
+_ALIGN_STATE_FACTORIES: Dict[str, Callable[[int], MovingState]] = {
+    "rand": lambda speed: MovingState.rand_dir_turn(controller, speed),
+    "l": lambda speed: MovingState.turn("l", speed),
+    "r": lambda speed: MovingState.turn("r", speed),
+}
+
+
+def _make_align_state(direction: str, speed: int) -> MovingState:
+    """
+    Make the turning state used for aligning, according to the configured direction.
+
+    Args:
+        direction (str): the align direction, allows ["rand", "l", "r"].
+        speed (int): the turning speed.
+
+    Returns:
+        MovingState: the turning state.
+
+    Raises:
+        ValueError: If the align direction is invalid.
+    """
+    if (factory := _ALIGN_STATE_FACTORIES.get(direction)) is None:
+        raise ValueError(f"Invalid align direction: {direction}")
+    return factory(speed)
+
 
 def make_edge_handler(
     app_config: APPConfig,
@@ -84,36 +283,37 @@ def make_edge_handler(
     # <editor-fold desc="Templates">
 
     # 定义不同移动状态，如停止、继续、后退等
+    edge_conf = run_config.edge
 
-    fallback_state = MovingState.straight(-run_config.edge.fallback_speed)
+    fallback_state = MovingState.straight(-edge_conf.fallback_speed)
 
-    fallback_transition = MovingTransition(run_config.edge.fallback_duration, breaker=edge_rear_breaker)
+    fallback_transition = MovingTransition(edge_conf.fallback_duration, breaker=edge_rear_breaker)
 
-    advance_state = MovingState.straight(run_config.edge.advance_speed)
+    advance_state = MovingState.straight(edge_conf.advance_speed)
 
-    advance_transition = MovingTransition(run_config.edge.advance_duration, breaker=edge_front_breaker)
+    advance_transition = MovingTransition(edge_conf.advance_duration, breaker=edge_front_breaker)
 
-    left_turn_state = MovingState.turn("l", run_config.edge.turn_speed)
+    left_turn_state = MovingState.turn("l", edge_conf.turn_speed)
 
-    right_turn_state = MovingState.turn("r", run_config.edge.turn_speed)
+    right_turn_state = MovingState.turn("r", edge_conf.turn_speed)
 
     rand_lr_turn_state = MovingState.rand_dir_turn(
-        controller, run_config.edge.turn_speed, turn_left_prob=run_config.edge.turn_left_prob
+        controller, edge_conf.turn_speed, turn_left_prob=edge_conf.turn_left_prob
     )
 
-    half_turn_transition = MovingTransition(run_config.edge.half_turn_duration)
+    half_turn_transition = MovingTransition(edge_conf.half_turn_duration)
 
-    full_turn_transition = MovingTransition(run_config.edge.full_turn_duration)
+    full_turn_transition = MovingTransition(edge_conf.full_turn_duration)
 
-    drift_left_back_state = MovingState.drift("rl", run_config.edge.drift_speed)
+    drift_left_back_state = MovingState.drift("rl", edge_conf.drift_speed)
 
-    drift_right_back_state = MovingState.drift("rr", run_config.edge.drift_speed)
+    drift_right_back_state = MovingState.drift("rr", edge_conf.drift_speed)
 
-    drift_transition = MovingTransition(run_config.edge.drift_duration)
+    drift_transition = MovingTransition(edge_conf.drift_duration)
     # </editor-fold>
 
     # <editor-fold desc="Initialize Containers">
-    transitions_pool: List[MovingTransition] = []
+    transitions_pack: List[List[MovingTransition]] = []
     (
         abnormal_exit.after_exiting.append(sig_light_registry.register_all("Edge|Abnormal Exit", Color.PURPLE))
         if app_config.debug.use_siglight
@@ -122,258 +322,147 @@ def make_edge_handler(
     (case_reg := CaseRegistry(EdgeCodeSign)).register(EdgeCodeSign.O_O_O_O, normal_exit)
     # </editor-fold>
 
-    # <editor-fold desc="1-Activation Cases">
-    # fallback and full turn right
-    [head_state, *_], transition = (
-        composer.init_container()
-        .add(fallback_state.clone())
-        .add(fallback_transition.clone())
-        .add(right_turn_state.clone())
-        .add(full_turn_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
-    )
-
-    transitions_pool.extend(transition)
-
-    case_reg.register(EdgeCodeSign.X_O_O_O, head_state)
-
-    # -----------------------------------------------------------------------------
-    # fallback and full turn left
-    [head_state, *_], transition = (
-        composer.init_container()
-        .add(fallback_state.clone())
-        .add(fallback_transition.clone())
-        .add(left_turn_state.clone())
-        .add(full_turn_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
-    )
-
-    transitions_pool.extend(transition)
-
-    case_reg.register(EdgeCodeSign.O_O_O_X, head_state)
-
-    # -----------------------------------------------------------------------------
-
-    # advance and half turn right
-    [head_state, *_], transition = (
-        composer.init_container()
-        .add(advance_state.clone())
-        .add(advance_transition.clone())
-        .add(right_turn_state.clone())
-        .add(half_turn_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
-    )
-
-    transitions_pool.extend(transition)
-
-    case_reg.register(EdgeCodeSign.O_X_O_O, head_state)
-
-    # -----------------------------------------------------------------------------
-
-    # advance and half turn left
-    [head_state, *_], transition = (
-        composer.init_container()
-        .add(advance_state.clone())
-        .add(advance_transition.clone())
-        .add(left_turn_state.clone())
-        .add(half_turn_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
-    )
-
-    transitions_pool.extend(transition)
-
-    case_reg.register(EdgeCodeSign.O_O_X_O, head_state)
-
+    # <editor-fold desc="Shared Transitions">
+    # a transition is allowed to start from several states as long as they all lead to the same destination,
+    # so the transitions sharing the same template and destination are built only once.
+    half_turn_to_exit = half_turn_transition.clone()
+    full_turn_to_exit = full_turn_transition.clone()
+    half_turn_to_advance = half_turn_transition.clone()
+    half_turn_to_fallback = half_turn_transition.clone()
     # </editor-fold>
 
-    # <editor-fold desc="2-Activation Cases">
+    # <editor-fold desc="Shared Suffixes">
+    # these chains are the tails of several cases, build them only once and let the cases enter them,
+    # since a state is allowed to be the destination of multiple transitions.
     # half turn right
-    [head_state, *_], transition = (
-        composer.init_container()
-        .add(right_turn_state.clone())
-        .add(half_turn_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
+    states, transition = _build_chain(
+        right_turn_state.clone(),
+        half_turn_to_exit,
+        abnormal_exit,
     )
+    right_half_turn_head = states[0]
 
-    transitions_pool.extend(transition)
-
-    case_reg.register(EdgeCodeSign.X_X_O_O, head_state)
+    transitions_pack.append(transition)
 
     # -----------------------------------------------------------------------------
 
     # half turn left
-    [head_state, *_], transition = (
-        composer.init_container()
-        .add(left_turn_state.clone())
-        .add(half_turn_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
+    states, transition = _build_chain(
+        left_turn_state.clone(),
+        half_turn_to_exit,
+        abnormal_exit,
     )
+    left_half_turn_head = states[0]
 
-    transitions_pool.extend(transition)
-
-    case_reg.register(EdgeCodeSign.O_O_X_X, head_state)
-
-    # -----------------------------------------------------------------------------
-
-    # fallback and full turn left or right
-    [head_state, *_], transition = (
-        composer.init_container()
-        .add(fallback_state.clone())
-        .add(fallback_transition.clone())
-        .add(rand_lr_turn_state.clone())
-        .add(full_turn_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
-    )
-
-    transitions_pool.extend(transition)
-
-    case_reg.register(EdgeCodeSign.X_O_O_X, head_state)
+    transitions_pack.append(transition)
 
     # -----------------------------------------------------------------------------
 
     # advance
-    [head_state, *_], transition = (
-        composer.init_container()
-        .add(advance_state.clone())
-        .add(advance_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
-    )
+    states, transition = _build_chain(advance_state.clone(), advance_transition.clone(), abnormal_exit)
+    advance_head = states[0]
 
-    transitions_pool.extend(transition)
-
-    case_reg.register(EdgeCodeSign.O_X_X_O, head_state)
+    transitions_pack.append(transition)
 
     # -----------------------------------------------------------------------------
 
-    # drift right back
-    [head_state, *_], transition = (
-        composer.init_container()
-        .add(drift_right_back_state.clone())
-        .add(drift_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
-    )
-
-    transitions_pool.extend(transition)
-
-    case_reg.register(EdgeCodeSign.X_O_X_O, head_state)
-
-    # -----------------------------------------------------------------------------
-
-    # drift left back
-    [head_state, *_], transition = (
-        composer.init_container()
-        .add(drift_left_back_state.clone())
-        .add(drift_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
-    )
-
-    transitions_pool.extend(transition)
+    # fallback
+    states, transition = _build_chain(fallback_state.clone(), fallback_transition.clone(), abnormal_exit)
+    fallback_head = states[0]
 
-    case_reg.register(EdgeCodeSign.O_X_O_X, head_state)
+    transitions_pack.append(transition)
 
     # </editor-fold>
 
-    # <editor-fold desc="3-Activation Cases">
-
-    # half turn left and advance
-    [head_state, *_], transition = (
-        composer.init_container()
-        .add(left_turn_state.clone())
-        .add(half_turn_transition.clone())
-        .add(advance_state.clone())
-        .add(advance_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
-    )
-
-    transitions_pool.extend(transition)
-
-    case_reg.register(EdgeCodeSign.O_X_X_X, head_state)
-
-    # -----------------------------------------------------------------------------
-
-    # half turn right and advance
-    [head_state, *_], transition = (
-        composer.init_container()
-        .add(right_turn_state.clone())
-        .add(half_turn_transition.clone())
-        .add(advance_state.clone())
-        .add(advance_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
-    )
-
-    transitions_pool.extend(transition)
-
-    case_reg.register(EdgeCodeSign.X_X_X_O, head_state)
-
-    # -----------------------------------------------------------------------------
-
-    # half turn right and fallback
-    [head_state, *_], transition = (
-        composer.init_container()
-        .add(right_turn_state.clone())
-        .add(half_turn_transition.clone())
-        .add(fallback_state.clone())
-        .add(fallback_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
-    )
-
-    transitions_pool.extend(transition)
-
-    case_reg.register(EdgeCodeSign.X_O_X_X, head_state)
-
-    # -----------------------------------------------------------------------------
-
-    # half turn left and fallback
-    [head_state, *_], transition = (
-        composer.init_container()
-        .add(left_turn_state.clone())
-        .add(half_turn_transition.clone())
-        .add(fallback_state.clone())
-        .add(fallback_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
-    )
-
-    transitions_pool.extend(transition)
-
-    case_reg.register(EdgeCodeSign.X_X_O_X, head_state)
-
-    # </editor-fold>
-
-    # <editor-fold desc="4-Activation Cases">
-    # just stop immediately, since such case are extremely rare in the normal race
-    [head_state, *_], transition = composer.init_container().add(abnormal_exit).export_structure()
-
-    transitions_pool.extend(transition)
-
-    case_reg.register(EdgeCodeSign.X_X_X_X, head_state)
-
+    # <editor-fold desc="Cases">
+    # each case is a chain of units that ends with either the abnormal exit or one of the shared suffixes
+    # the local templates are cloned on their earlier uses, the last use takes the template itself,
+    # e.g. rand_lr_turn_state and the drift states, so the composer does mutate those and they must not be reused.
+    # the transitions leading to the same destination are shared on purpose and their from_states grow with each use,
+    # i.e. drift_transition and the half_turn_to_*/full_turn_to_exit transitions, see the Shared Transitions above.
+    # botix compiles the cases into a match statement that tests them in registration order,
+    # so the cases are listed from the most frequent to the rarest, i.e. by the number of activations.
+    branches: List[Tuple[Tuple[MovingState | MovingTransition, ...], EdgeCodeSign]] = [
+        # 1-Activation Cases
+        # fallback and full turn right
+        (
+            (
+                fallback_state.clone(),
+                fallback_transition.clone(),
+                right_turn_state.clone(),
+                full_turn_to_exit,
+                abnormal_exit,
+            ),
+            EdgeCodeSign.X_O_O_O,
+        ),
+        # fallback and full turn left
+        (
+            (
+                fallback_state.clone(),
+                fallback_transition.clone(),
+                left_turn_state.clone(),
+                full_turn_to_exit,
+                abnormal_exit,
+            ),
+            EdgeCodeSign.O_O_O_X,
+        ),
+        # advance and half turn right
+        ((advance_state.clone(), advance_transition.clone(), right_half_turn_head), EdgeCodeSign.O_X_O_O),
+        # advance and half turn left
+        ((advance_state.clone(), advance_transition.clone(), left_half_turn_head), EdgeCodeSign.O_O_X_O),
+        # 2-Activation Cases
+        # half turn right
+        ((right_half_turn_head,), EdgeCodeSign.X_X_O_O),
+        # half turn left
+        ((left_half_turn_head,), EdgeCodeSign.O_O_X_X),
+        # advance
+        ((advance_head,), EdgeCodeSign.O_X_X_O),
+        # fallback and full turn left or right
+        (
+            (
+                fallback_state.clone(),
+                fallback_transition.clone(),
+                rand_lr_turn_state,
+                full_turn_to_exit,
+                abnormal_exit,
+            ),
+            EdgeCodeSign.X_O_O_X,
+        ),
+        # drift right back
+        ((drift_right_back_state, drift_transition, abnormal_exit), EdgeCodeSign.X_O_X_O),
+        # drift left back
+        ((drift_left_back_state, drift_transition, abnormal_exit), EdgeCodeSign.O_X_O_X),
+        # 3-Activation Cases
+        # half turn left and advance
+        ((left_turn_state.clone(), half_turn_to_advance, advance_head), EdgeCodeSign.O_X_X_X),
+        # half turn right and advance
+        ((right_turn_state.clone(), half_turn_to_advance, advance_head), EdgeCodeSign.X_X_X_O),
+        # half turn right and fallback
+        ((right_turn_state.clone(), half_turn_to_fallback, fallback_head), EdgeCodeSign.X_O_X_X),
+        # half turn left and fallback
+        ((left_turn_state.clone(), half_turn_to_fallback, fallback_head), EdgeCodeSign.X_X_O_X),
+        # 4-Activation Cases
+        # just stop immediately, since such case are extremely rare in the normal race
+        ((abnormal_exit,), EdgeCodeSign.X_X_X_X),
+    ]
+    for units, code in branches:
+        states, transition = _build_chain(*units)
+        head_state = states[0]
+        transitions_pack.append(transition)
+        case_reg.register(code, head_state)
     # </editor-fold>
 
     # <editor-fold desc="Assembly">
-    _, head_trans = (
-        composer.init_container()
-        .add(start_state)
-        .add(
-            MovingTransition(run_config.perf.checking_duration, breaker=edge_full_breaker, to_states=case_reg.export())
-        )
-        .export_structure()
+    _, head_trans = _build_chain(
+        start_state,
+        MovingTransition(run_config.perf.checking_duration, breaker=edge_full_breaker, to_states=case_reg.export()),
     )
 
-    transitions_pool.extend(head_trans)
+    transitions_pack.append(head_trans)
+
+    # flatten all the chains at once, instead of growing the pool chain by chain,
+    # the shared transitions are packed by every chain they are in, so drop the duplicates while keeping the order
+    transitions_pool: List[MovingTransition] = list(dict.fromkeys(chain.from_iterable(transitions_pack)))
 
     # </editor-fold>
 
@@ -421,11 +510,11 @@ def make_surrounding_handler(
 
     surr_full_breaker = Breakers.make_surr_breaker(app_config, run_config)
 
-    atk_breaker = (
-        Breakers.make_atk_breaker_with_edge_sensors(app_config, run_config)
-        if surr_conf.atk_break_use_edge_sensors and any([_logger.info("Using edge sensors to end the atk"), True])
-        else Breakers.make_std_atk_breaker(app_config, run_config)
-    )
+    if surr_conf.atk_break_use_edge_sensors:
+        _logger.info("Using edge sensors to end the atk")
+        atk_breaker = Breakers.make_atk_breaker_with_edge_sensors(app_config, run_config)
+    else:
+        atk_breaker = Breakers.make_std_atk_breaker(app_config, run_config)
 
     edge_rear_breaker = Breakers.make_std_edge_rear_breaker(app_config, run_config)
 
@@ -456,11 +545,16 @@ def make_surrounding_handler(
         )
 
         edge_fallback_state.after_exiting.append(sig_light_registry.register_all("Surr|Edge fallback", Color.CYAN))
-    atk_enemy_car_transition = MovingTransition(surr_conf.atk_speed_enemy_car, breaker=atk_breaker)
-    atk_enemy_box_transition = MovingTransition(surr_conf.atk_speed_enemy_box, breaker=atk_breaker)
-    atk_neutral_box_transition = MovingTransition(surr_conf.atk_neutral_box_duration, breaker=atk_breaker)
-    allay_fallback_transition = MovingTransition(surr_conf.fallback_duration_ally_box, breaker=edge_rear_breaker)
-    edge_fallback_transition = MovingTransition(surr_conf.fallback_duration_edge, breaker=edge_rear_breaker)
+    # transitions of the same kind only differ in duration, bind their breakers once
+    make_atk_transition = partial(MovingTransition, breaker=atk_breaker)
+    make_fallback_transition = partial(MovingTransition, breaker=edge_rear_breaker)
+    make_turn_transition = partial(MovingTransition, breaker=turn_to_front_breaker)
+
+    atk_enemy_car_transition = make_atk_transition(surr_conf.atk_speed_enemy_car)
+    atk_enemy_box_transition = make_atk_transition(surr_conf.atk_speed_enemy_box)
+    atk_neutral_box_transition = make_atk_transition(surr_conf.atk_neutral_box_duration)
+    allay_fallback_transition = make_fallback_transition(surr_conf.fallback_duration_ally_box)
+    edge_fallback_transition = make_fallback_transition(surr_conf.fallback_duration_edge)
 
     rand_turn_state = MovingState.rand_dir_turn(
         controller, surr_conf.turn_speed, turn_left_prob=surr_conf.turn_left_prob
@@ -480,276 +574,113 @@ def make_surrounding_handler(
         weights=surr_conf.rand_turn_speed_weights,
     )
 
-    full_turn_transition = MovingTransition(surr_conf.full_turn_duration, breaker=turn_to_front_breaker)
-    half_turn_transition = MovingTransition(surr_conf.half_turn_duration, breaker=turn_to_front_breaker)
+    full_turn_transition = make_turn_transition(surr_conf.full_turn_duration)
+    half_turn_transition = make_turn_transition(surr_conf.half_turn_duration)
     # </editor-fold>
 
     # <editor-fold desc="Init Container">
-    transitions_pool: List[MovingTransition] = []
+    transitions_pack: List[List[MovingTransition]] = []
 
     (case_reg := CaseRegistry(SurroundingCodeSign)).register(SurroundingCodeSign.NOTHING, normal_exit)
     # </editor-fold>
 
-    # <editor-fold desc="Front enemy car">
+    # <editor-fold desc="Shared Suffixes">
+    # the suffixes below are shared by all the cases, states can be safely entered from multiple transitions,
+    # so we build them only once instead of cloning the whole chain for each case.
     # ---------------------------------------------------------------------
-
-    # atk and fallback and full random turn then stop
-    [head_state, *_], transitions = (
-        composer.init_container()
-        .add(atk_enemy_car_state.clone())
-        .add(atk_enemy_car_transition.clone())
-        .add(edge_fallback_state.clone())
-        .add(edge_fallback_transition.clone())
-        .add(rand_turn_state.clone())
-        .add(full_turn_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
+    # full random turn then stop
+    states, transitions = _build_chain(
+        rand_turn_state.clone(),
+        full_turn_transition.clone(),
+        abnormal_exit,
     )
+    turn_head_state = states[0]
 
-    transitions_pool.extend(transitions)
-
-    case_reg.batch_register(
-        [
-            SurroundingCodeSign.FRONT_ENEMY_CAR,
-            SurroundingCodeSign.FRONT_ENEMY_CAR_RIGHT_OBJECT,
-            SurroundingCodeSign.FRONT_ENEMY_CAR_LEFT_OBJECT,
-            SurroundingCodeSign.FRONT_ENEMY_CAR_BEHIND_OBJECT,
-            SurroundingCodeSign.FRONT_ENEMY_CAR_LEFT_RIGHT_OBJECTS,
-            SurroundingCodeSign.FRONT_ENEMY_CAR_RIGHT_BEHIND_OBJECTS,
-            SurroundingCodeSign.FRONT_ENEMY_CAR_LEFT_BEHIND_OBJECTS,
-            SurroundingCodeSign.FRONT_ENEMY_CAR_LEFT_RIGHT_BEHIND_OBJECTS,
-        ],
-        head_state,
-    )
-    # ---------------------------------------------------------------------
-    # </editor-fold>
-
-    # <editor-fold desc="Target switch">
+    transitions_pack.append(transitions)
     # ---------------------------------------------------------------------
-    # full random turn atk and fallback and full random turn then stop
-    [head_state, *_], transitions = (
-        composer.init_container()
-        .add(rand_turn_state.clone())
-        .add(full_turn_transition.clone())
-        .add(atk_enemy_car_state.clone())
-        .add(atk_enemy_car_transition.clone())
-        .add(edge_fallback_state.clone())
-        .add(edge_fallback_transition.clone())
-        .add(rand_turn_state.clone())
-        .add(full_turn_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
-    )
-
-    transitions_pool.extend(transitions)
-    case_reg.batch_register(
-        [
-            SurroundingCodeSign.BEHIND_OBJECT,
-            SurroundingCodeSign.LEFT_RIGHT_BEHIND_OBJECTS,
-            SurroundingCodeSign.FRONT_ENEMY_BOX_BEHIND_OBJECT,
-            SurroundingCodeSign.FRONT_ALLY_BOX_BEHIND_OBJECT,
-            SurroundingCodeSign.FRONT_NEUTRAL_BOX_BEHIND_OBJECT,
-            SurroundingCodeSign.FRONT_ALLY_BOX_LEFT_RIGHT_BEHIND_OBJECTS,
-            SurroundingCodeSign.FRONT_NEUTRAL_BOX_LEFT_RIGHT_BEHIND_OBJECTS,
-            SurroundingCodeSign.FRONT_ENEMY_BOX_LEFT_RIGHT_BEHIND_OBJECTS,
-        ],
-        head_state,
-    )  # ---------------------------------------------------------------------
-    # half turn left atk and fallback and full random turn then stop
-    [head_state, *_], transitions = (
-        composer.init_container()
-        .add(left_turn_state.clone())
-        .add(half_turn_transition.clone())
-        .add(atk_enemy_car_state.clone())
-        .add(atk_enemy_car_transition.clone())
-        .add(edge_fallback_state.clone())
-        .add(edge_fallback_transition.clone())
-        .add(rand_turn_state.clone())
-        .add(full_turn_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
-    )
-
-    transitions_pool.extend(transitions)
-    case_reg.batch_register(
-        [
-            SurroundingCodeSign.LEFT_OBJECT,
-            SurroundingCodeSign.FRONT_ENEMY_BOX_LEFT_OBJECT,
-            SurroundingCodeSign.FRONT_ALLY_BOX_LEFT_OBJECT,
-            SurroundingCodeSign.FRONT_NEUTRAL_BOX_LEFT_OBJECT,
-        ],
-        head_state,
-    )
-    # ---------------------------------------------------------------------
-    # half turn right atk and fallback and full random turn then stop
-    [head_state, *_], transitions = (
-        composer.init_container()
-        .add(right_turn_state.clone())
-        .add(half_turn_transition.clone())
-        .add(atk_enemy_car_state.clone())
-        .add(atk_enemy_car_transition.clone())
-        .add(edge_fallback_state.clone())
-        .add(edge_fallback_transition.clone())
-        .add(rand_turn_state.clone())
-        .add(full_turn_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
-    )
-
-    transitions_pool.extend(transitions)
-    case_reg.batch_register(
-        [
-            SurroundingCodeSign.RIGHT_OBJECT,
-            SurroundingCodeSign.FRONT_ENEMY_BOX_RIGHT_OBJECT,
-            SurroundingCodeSign.FRONT_ALLY_BOX_RIGHT_OBJECT,
-            SurroundingCodeSign.FRONT_NEUTRAL_BOX_RIGHT_OBJECT,
-        ],
-        head_state,
-    )
-    # ---------------------------------------------------------------------
-    # half random turn atk and fallback and full random turn then stop
-    [head_state, *_], transitions = (
-        composer.init_container()
-        .add(rand_turn_state.clone())
-        .add(half_turn_transition.clone())
-        .add(atk_enemy_car_state.clone())
-        .add(atk_enemy_car_transition.clone())
-        .add(edge_fallback_state.clone())
-        .add(edge_fallback_transition.clone())
-        .add(rand_turn_state.clone())
-        .add(full_turn_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
-    )
-
-    transitions_pool.extend(transitions)
-    case_reg.batch_register(
-        [
-            SurroundingCodeSign.LEFT_RIGHT_OBJECTS,
-            SurroundingCodeSign.FRONT_ENEMY_BOX_LEFT_RIGHT_OBJECTS,
-            SurroundingCodeSign.FRONT_ALLY_BOX_LEFT_RIGHT_OBJECTS,
-            SurroundingCodeSign.FRONT_NEUTRAL_BOX_LEFT_RIGHT_OBJECTS,
-        ],
-        head_state,
-    )
-
-    # ---------------------------------------------------------------------
-    # random spd turn left atk and fallback and full random turn then stop
-    [head_state, *_], transitions = (
-        composer.init_container()
-        .add(rand_spd_turn_left_state.clone())
-        .add(full_turn_transition.clone())
-        .add(atk_enemy_car_state.clone())
-        .add(atk_enemy_car_transition.clone())
-        .add(edge_fallback_state.clone())
-        .add(edge_fallback_transition.clone())
-        .add(rand_turn_state.clone())
-        .add(full_turn_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
+    # fallback and full random turn then stop
+    states, transitions = _build_chain(
+        edge_fallback_state,
+        edge_fallback_transition,
+        turn_head_state,
     )
+    fallback_head_state = states[0]
 
-    transitions_pool.extend(transitions)
-    case_reg.batch_register(
-        [
-            SurroundingCodeSign.LEFT_BEHIND_OBJECTS,
-            SurroundingCodeSign.FRONT_ENEMY_BOX_LEFT_BEHIND_OBJECTS,
-            SurroundingCodeSign.FRONT_ALLY_BOX_LEFT_BEHIND_OBJECTS,
-            SurroundingCodeSign.FRONT_NEUTRAL_BOX_LEFT_BEHIND_OBJECTS,
-        ],
-        head_state,
-    )
+    transitions_pack.append(transitions)
     # ---------------------------------------------------------------------
-    # random spd turn right atk and fallback and full random turn then stop
-    [head_state, *_], transitions = (
-        composer.init_container()
-        .add(rand_spd_turn_right_state.clone())
-        .add(full_turn_transition.clone())
-        .add(atk_enemy_car_state.clone())
-        .add(atk_enemy_car_transition.clone())
-        .add(edge_fallback_state.clone())
-        .add(edge_fallback_transition.clone())
-        .add(rand_turn_state.clone())
-        .add(full_turn_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
+    # atk and fallback and full random turn then stop
+    states, transitions = _build_chain(
+        atk_enemy_car_state,
+        atk_enemy_car_transition,
+        fallback_head_state,
     )
+    atk_head_state = states[0]
 
-    transitions_pool.extend(transitions)
-    case_reg.batch_register(
-        [
-            SurroundingCodeSign.RIGHT_BEHIND_OBJECTS,
-            SurroundingCodeSign.FRONT_ENEMY_BOX_RIGHT_BEHIND_OBJECTS,
-            SurroundingCodeSign.FRONT_ALLY_BOX_RIGHT_BEHIND_OBJECTS,
-            SurroundingCodeSign.FRONT_NEUTRAL_BOX_RIGHT_BEHIND_OBJECTS,
-        ],
-        head_state,
-    )
+    transitions_pack.append(transitions)
     # ---------------------------------------------------------------------
     # </editor-fold>
 
-    # <editor-fold desc="Front box only">
+    # <editor-fold desc="Front enemy car">
     # ---------------------------------------------------------------------
     # atk and fallback and full random turn then stop
-    [head_state, *_], transitions = (
-        composer.init_container()
-        .add(atk_enemy_box_state.clone())
-        .add(atk_enemy_box_transition.clone())
-        .add(edge_fallback_state.clone())
-        .add(edge_fallback_transition.clone())
-        .add(rand_turn_state.clone())
-        .add(full_turn_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
-    )
-
-    transitions_pool.extend(transitions)
-    case_reg.register(SurroundingCodeSign.FRONT_ENEMY_BOX, head_state)
+    case_reg.batch_register(_FRONT_ENEMY_CAR_CODES, atk_head_state)
     # ---------------------------------------------------------------------
-    # atk and fallback and full random turn then stop
-    [head_state, *_], transitions = (
-        composer.init_container()
-        .add(atk_neutral_box_state.clone())
-        .add(atk_neutral_box_transition.clone())
-        .add(edge_fallback_state.clone())
-        .add(edge_fallback_transition.clone())
-        .add(rand_turn_state.clone())
-        .add(full_turn_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
-    )
-    transitions_pool.extend(transitions)
-    case_reg.register(SurroundingCodeSign.FRONT_NEUTRAL_BOX, head_state)
-    # ---------------------------------------------------------------------
-    # fallback and full random turn then stop
-    [head_state, *_], transitions = (
-        composer.init_container()
-        .add(allay_fallback_state.clone())
-        .add(allay_fallback_transition.clone())
-        .add(rand_turn_state.clone())
-        .add(full_turn_transition.clone())
-        .add(abnormal_exit)
-        .export_structure()
-    )
-    transitions_pool.extend(transitions)
-    case_reg.register(SurroundingCodeSign.FRONT_ALLY_BOX, head_state)
+    # </editor-fold>
 
-    # ---------------------------------------------------------------------
+    # <editor-fold desc="Cases">
+    # each case is a chain of units that ends with one of the shared suffixes
+    # only the earlier uses of a template need a clone, the last use takes the template itself.
+    # the turn transitions all lead to the atk head, so they are shared by the cases instead of being cloned,
+    # since a transition is allowed to start from several states as long as they have the same destination.
+    branches: List[Tuple[Tuple[MovingState | MovingTransition, ...], Tuple[SurroundingCodeSign, ...]]] = [
+        # Target switch
+        # full random turn atk and fallback and full random turn then stop
+        ((rand_turn_state.clone(), full_turn_transition, atk_head_state), _BEHIND_CODES),
+        # half turn left atk and fallback and full random turn then stop
+        ((left_turn_state, half_turn_transition, atk_head_state), _LEFT_CODES),
+        # half turn right atk and fallback and full random turn then stop
+        ((right_turn_state, half_turn_transition, atk_head_state), _RIGHT_CODES),
+        # half random turn atk and fallback and full random turn then stop
+        ((rand_turn_state, half_turn_transition, atk_head_state), _LEFT_RIGHT_CODES),
+        # random spd turn left atk and fallback and full random turn then stop
+        ((rand_spd_turn_left_state, full_turn_transition, atk_head_state), _LEFT_BEHIND_CODES),
+        # random spd turn right atk and fallback and full random turn then stop
+        ((rand_spd_turn_right_state, full_turn_transition, atk_head_state), _RIGHT_BEHIND_CODES),
+        # Front box only
+        # atk and fallback and full random turn then stop
+        (
+            (atk_enemy_box_state, atk_enemy_box_transition, fallback_head_state),
+            (SurroundingCodeSign.FRONT_ENEMY_BOX,),
+        ),
+        # atk and fallback and full random turn then stop
+        (
+            (atk_neutral_box_state, atk_neutral_box_transition, fallback_head_state),
+            (SurroundingCodeSign.FRONT_NEUTRAL_BOX,),
+        ),
+        # fallback and full random turn then stop
+        (
+            (allay_fallback_state, allay_fallback_transition, turn_head_state),
+            (SurroundingCodeSign.FRONT_ALLY_BOX,),
+        ),
+    ]
+    for units, codes in branches:
+        states, transitions = _build_chain(*units)
+        head_state = states[0]
+        transitions_pack.append(transitions)
+        case_reg.batch_register(codes, head_state)
     # </editor-fold>
 
     # <editor-fold desc="Assembly">
-    _, head_trans = (
-        composer.init_container()
-        .add(start_state)
-        .add(
-            MovingTransition(run_config.perf.checking_duration, breaker=surr_full_breaker, to_states=case_reg.export())
-        )
-        .export_structure()
+    _, head_trans = _build_chain(
+        start_state,
+        MovingTransition(run_config.perf.checking_duration, breaker=surr_full_breaker, to_states=case_reg.export()),
     )
     # </editor-fold>
 
     # <editor-fold desc="Make Return">
-    transitions_pool.extend(head_trans)
+    transitions_pack.append(head_trans)
+    # the shared transitions are packed by every chain they are in, drop the duplicates while keeping the order
+    transitions_pool: List[MovingTransition] = list(dict.fromkeys(chain.from_iterable(transitions_pack)))
 
     return start_state, normal_exit, abnormal_exit, transitions_pool
     # </editor-fold>
@@ -788,8 +719,8 @@ def make_scan_handler(
         else None
     )
     scan_state.before_entering.append(
-        controller.register_context_executor(
-            sensors.adc_all_channels, output_keys=ContextVar.recorded_pack.name, function_name="update_recorded_pack"
+        _context_executor(
+            sensors.adc_all_channels, output_keys=_RECORDED_PACK_KEY, function_name="update_recorded_pack"
         )
     )
     if app_config.debug.log_level == "DEBUG":
@@ -815,95 +746,25 @@ def make_scan_handler(
         if app_config.debug.use_siglight
         else None
     )
-    transitions_pool: List[MovingTransition] = []
-    # ---------------------------------------------------------------------
-    [head_state, *_], transitions = composer.init_container().add(end_state).export_structure()
-
-    transitions_pool.extend(transitions)
-    case_reg.register(ScanCodesign.O_O_O_O, head_state)
-    # ---------------------------------------------------------------------
-    [head_state, *_], transitions = (
-        composer.init_container()
-        .add(fall_back_state.clone())
-        .add(fall_back_transition.clone())
-        .add(end_state)
-        .export_structure()
-    )
-
-    transitions_pool.extend(transitions)
-    case_reg.batch_register([ScanCodesign.X_O_O_O, ScanCodesign.X_O_X_X], head_state)
-    # ---------------------------------------------------------------------
-    [head_state, *_], transitions = (
-        composer.init_container()
-        .add(rand_turn_state.clone())
-        .add(full_turn_transition.clone())
-        .add(end_state)
-        .export_structure()
-    )
-
-    transitions_pool.extend(transitions)
-    case_reg.batch_register(
-        [
-            ScanCodesign.X_X_X_X,
-            ScanCodesign.X_X_X_O,
-            ScanCodesign.X_X_O_X,
-            ScanCodesign.O_X_X_X,
-            ScanCodesign.X_X_O_O,
-            ScanCodesign.O_X_X_O,
-            ScanCodesign.O_X_O_X,
-            ScanCodesign.O_X_O_O,
-        ],
-        head_state,
-    )
-    # ---------------------------------------------------------------------
-    [head_state, *_], transitions = (
-        composer.init_container()
-        .add(turn_left_state.clone())
-        .add(half_turn_transition.clone())
-        .add(end_state)
-        .export_structure()
-    )
-
-    transitions_pool.extend(transitions)
-    case_reg.batch_register(
-        [
-            ScanCodesign.O_O_X_O,
-            ScanCodesign.X_O_X_O,
-        ],
-        head_state,
-    )
-
-    # ---------------------------------------------------------------------
-    [head_state, *_], transitions = (
-        composer.init_container()
-        .add(turn_right_state.clone())
-        .add(half_turn_transition.clone())
-        .add(end_state)
-        .export_structure()
-    )
-
-    transitions_pool.extend(transitions)
-    case_reg.batch_register(
-        [
-            ScanCodesign.O_O_O_X,
-            ScanCodesign.X_O_O_X,
-        ],
-        head_state,
-    )
-
-    # ---------------------------------------------------------------------
-    [head_state, *_], transitions = (
-        composer.init_container()
-        .add(fall_back_state.clone())
-        .add(fall_back_transition.clone())
-        .add(rand_turn_state.clone())
-        .add(half_turn_transition.clone())
-        .add(end_state)
-        .export_structure()
-    )
-
-    transitions_pool.extend(transitions)
-    case_reg.register(ScanCodesign.O_O_X_X, head_state)
+    transitions_pack: List[List[MovingTransition]] = []
+    # the templates are local to this handler, so the last use of each template takes the template itself,
+    # only the earlier uses need a clone.
+    branches: List[Tuple[Tuple[MovingState | MovingTransition, ...], Tuple[ScanCodesign, ...]]] = [
+        ((), (ScanCodesign.O_O_O_O,)),
+        ((fall_back_state.clone(), fall_back_transition.clone()), _SCAN_FALL_BACK_CODES),
+        ((rand_turn_state.clone(), full_turn_transition), _SCAN_RAND_TURN_CODES),
+        ((turn_left_state, half_turn_transition.clone()), _SCAN_TURN_LEFT_CODES),
+        ((turn_right_state, half_turn_transition.clone()), _SCAN_TURN_RIGHT_CODES),
+        (
+            (fall_back_state, fall_back_transition, rand_turn_state, half_turn_transition),
+            (ScanCodesign.O_O_X_X,),
+        ),
+    ]
+    for units, codes in branches:
+        states, transitions = _build_chain(*units, end_state)
+        head_state = states[0]
+        transitions_pack.append(transitions)
+        case_reg.batch_register(codes, head_state)
     # ---------------------------------------------------------------------
     composer.init_container()
     if conf.check_gray_adc_before_scan:
@@ -914,18 +775,10 @@ def make_scan_handler(
         )
     if conf.check_edge_before_scan:
         _logger.debug("Checking edge before scan")
-        check_edge_breaker = Breakers.make_std_edge_full_breaker(app_config, run_config)
-
-        def boolean_full_edge_breaker() -> bool:
-            """
-            converts the  edge breaker to a boolean edge breaker
-            Returns:
-
-            """
-            return bool(check_edge_breaker())
+        check_edge_breaker = Breakers.make_std_edge_full_bool_breaker(app_config, run_config)
 
         composer.add(MovingState.halt(), register_case=False).add(
-            MovingTransition(0, breaker=boolean_full_edge_breaker, to_states={True: make_salvo_end_state()})
+            MovingTransition(0, breaker=check_edge_breaker, to_states={True: make_salvo_end_state()})
         )
 
     states, transitions = (
@@ -934,8 +787,8 @@ def make_scan_handler(
         .export_structure()
     )
 
-    transitions_pool.extend(transitions)
-    return states, transitions_pool
+    transitions_pack.append(transitions)
+    return states, list(chain.from_iterable(transitions_pack))
 
 
 def make_rand_turn_handler(
@@ -963,39 +816,28 @@ def make_rand_turn_handler(
         if app_config.debug.use_siglight
         else None
     )
-    breaker = (
-        Breakers.make_std_turn_to_front_breaker(app_config, run_config)
-        if conf.use_turn_to_front and any([_logger.info("RTurn uses TTF Breaker"), True])
-        else None
-    )
+    if conf.use_turn_to_front:
+        _logger.info("RTurn uses TTF Breaker")
+        breaker = Breakers.make_std_turn_to_front_breaker(app_config, run_config)
+    else:
+        breaker = None
     half_turn_transition = MovingTransition(conf.half_turn_duration, breaker=breaker)
 
     states, transitions = composer.add(rand_lr_turn_state).add(half_turn_transition).add(end_state).export_structure()
     return states, transitions
 
 
-def make_gradient_move(
-    app_config: APPConfig, run_config: RunConfig, is_salvo_end: bool = True, fall_back: bool = False
-) -> MovingState:
+@lru_cache(maxsize=None)
+def _make_gradient_speed_calc(app_config: APPConfig, run_config: RunConfig, fall_back: bool) -> Callable[[], int]:
     """
-    Generates a MovingState object for a gradient move in a search algorithm.
-
-    Args:
-        app_config (APPConfig): The application configuration.
-        run_config (RunConfig): The run configuration.
-        is_salvo_end (bool, optional): Indicates if this is the last gradient move in a salvo. Defaults to True.
-        fall_back (bool): Indicates if the gradient move should be in the opposite direction.
-
-    Returns:
-        MovingState: The MovingState object representing the gradient move.
-
+    Build the gradient speed calculator, cached like the breakers to skip the code generation on rebuilds.
     """
     conf = run_config.search.gradient_move
 
     sign = "-" if fall_back else ""
     speed_range = conf.max_speed - conf.min_speed
 
-    speed_calc_func = menta.construct_inlined_function(
+    return menta.construct_inlined_function(
         usages=[
             SamplerUsage(
                 used_sampler_index=SamplerIndexes.adc_all, required_data_indexes=[app_config.sensor.gray_adc_index]
@@ -1006,26 +848,43 @@ def make_gradient_move(
         return_raw=False,
         function_name="calc_gradient_speed",
     )
+
+
+def make_gradient_move(
+    app_config: APPConfig, run_config: RunConfig, is_salvo_end: bool = True, fall_back: bool = False
+) -> MovingState:
+    """
+    Generates a MovingState object for a gradient move in a search algorithm.
+
+    Args:
+        app_config (APPConfig): The application configuration.
+        run_config (RunConfig): The run configuration.
+        is_salvo_end (bool, optional): Indicates if this is the last gradient move in a salvo. Defaults to True.
+        fall_back (bool): Indicates if the gradient move should be in the opposite direction.
+
+    Returns:
+        MovingState: The MovingState object representing the gradient move.
+
+    """
+    speed_calc_func = _make_gradient_speed_calc(app_config, run_config, fall_back)
     updaters = []
-    speed_updater = controller.register_context_executor(
-        speed_calc_func, [ContextVar.gradient_speed.name], function_name="_update_gradient_speed"
+    speed_updater = _context_executor(
+        speed_calc_func, output_keys=(_GRADIENT_SPEED_KEY,), function_name="_update_gradient_speed"
     )
     updaters.append(speed_updater)
     if is_salvo_end:
-        getter: Callable[[], int] = controller.register_context_getter(ContextVar.gradient_speed.name)
-
-        def _update_salvo_end_speed() -> Tuple[int, int, int, int]:
-            speed = getter()
-            return speed, speed, speed, speed
-
-        salvo_end_speed_updater = controller.register_context_executor(
-            _update_salvo_end_speed, [ContextVar.prev_salvo_speed.name], function_name="_update_salvo_end_speed"
+        # feed the gradient speed straight from the context, no getter closure in between
+        salvo_end_speed_updater = _context_executor(
+            _broadcast_speed,
+            output_keys=(_PREV_SALVO_SPEED_KEY,),
+            input_keys=(_GRADIENT_SPEED_KEY,),
+            function_name="_update_salvo_end_speed",
         )
         updaters.append(salvo_end_speed_updater)
 
     return MovingState(
-        speed_expressions=ContextVar.gradient_speed.name,
-        used_context_variables=[ContextVar.gradient_speed.name],
+        speed_expressions=_GRADIENT_SPEED_KEY,
+        used_context_variables=[_GRADIENT_SPEED_KEY],
         before_entering=updaters,
         after_exiting=(
             [sig_light_registry.register_all("GMove|Start gradient move", Color.BLUE)]
@@ -1055,37 +914,44 @@ def make_search_handler(
     """
     start_state = start_state or continues_state.clone()
     stop_state = stop_state or MovingState.halt()
-    scan_states, scan_transitions = make_scan_handler(app_config, run_config, end_state=stop_state)
-    rand_turn_states, rand_turn_transitions = make_rand_turn_handler(app_config, run_config, end_state=stop_state)
-    grad_move_state = make_gradient_move(app_config, run_config, is_salvo_end=True)
-
+    # only build the sub handlers that are enabled, the disabled ones are never selected
+    sub_states: List[MovingState] = []
+    sub_transitions: List[MovingTransition] = []
     pool = []
     w = []
+    case_reg = CaseRegistry(SearchCodesign)
     if run_config.search.use_gradient_move:
         _logger.info(f"Using gradient move, weight: {run_config.search.gradient_move_weight}")
+        grad_move_state = make_gradient_move(app_config, run_config, is_salvo_end=True)
         pool.append(SearchCodesign.GRADIENT_MOVE)
         w.append(run_config.search.gradient_move_weight)
+        case_reg.register(SearchCodesign.GRADIENT_MOVE, grad_move_state)
+        sub_states.append(grad_move_state)
     if run_config.search.use_rand_turn:
         _logger.info(f"Using random turn, weight: {run_config.search.rand_turn_weight}")
+        rand_turn_states, rand_turn_transitions = make_rand_turn_handler(app_config, run_config, end_state=stop_state)
         pool.append(SearchCodesign.RAND_TURN)
         w.append(run_config.search.rand_turn_weight)
+        case_reg.register(SearchCodesign.RAND_TURN, rand_turn_states[0])
+        sub_states.extend(rand_turn_states)
+        sub_transitions.extend(rand_turn_transitions)
     if run_config.search.use_scan_move:
         _logger.info(f"Using scan move, weight: {run_config.search.scan_move_weight}")
+        scan_states, scan_transitions = make_scan_handler(app_config, run_config, end_state=stop_state)
         pool.append(SearchCodesign.SCAN_MOVE)
         w.append(run_config.search.scan_move_weight)
+        case_reg.register(SearchCodesign.SCAN_MOVE, scan_states[0])
+        sub_states.extend(scan_states)
+        sub_transitions.extend(scan_transitions)
 
     w_selector = make_weighted_selector(pool, w)
-    case_reg = CaseRegistry(SearchCodesign)
 
-    case_reg.register(SearchCodesign.GRADIENT_MOVE, grad_move_state)
-    case_reg.register(SearchCodesign.RAND_TURN, rand_turn_states[0])
-    case_reg.register(SearchCodesign.SCAN_MOVE, scan_states[0])
+    # the disabled cases are left unregistered on purpose, since the selector never returns them
+    trans = MovingTransition(0, breaker=w_selector, to_states=case_reg.export(force=True))
+    states, transitions = _build_chain(start_state, trans)
 
-    trans = MovingTransition(0, breaker=w_selector, to_states=case_reg.export())
-    states, transitions = composer.init_container().add(start_state).add(trans).export_structure()
-
-    states_pool = [*states, *scan_states, *rand_turn_states, grad_move_state]
-    transitions_pool = [*transitions, *scan_transitions, *rand_turn_transitions]
+    states_pool = list(chain(states, sub_states))
+    transitions_pool = list(chain(transitions, sub_transitions))
     return states_pool, transitions_pool
 
 
@@ -1119,11 +985,11 @@ def make_fence_handler(
         start_state.after_exiting.append(_log_state)
     fence_breaker = Breakers.make_std_fence_breaker(app_config, run_config)
 
-    align_stage_breaker = (
-        Breakers.make_stage_align_breaker_mpu(app_config, run_config)
-        if run_config.fence.use_mpu_align_stage and any([_logger.info("Using MPU to align stage"), True])
-        else Breakers.make_std_stage_align_breaker(app_config, run_config)
-    )
+    if run_config.fence.use_mpu_align_stage:
+        _logger.info("Using MPU to align stage")
+        align_stage_breaker = Breakers.make_stage_align_breaker_mpu(app_config, run_config)
+    else:
+        align_stage_breaker = Breakers.make_std_stage_align_breaker(app_config, run_config)
     lr_blocked_breaker = Breakers.make_lr_sides_blocked_breaker(app_config, run_config)
 
     back_stage_states, back_stage_transitions, _, back_stage_trans_all = make_back_to_stage_handler(
@@ -1143,15 +1009,7 @@ def make_fence_handler(
 
     exit_duration = MovingTransition(conf.max_exit_corner_duration, breaker=lr_blocked_breaker)
 
-    match conf.stage_align_direction:
-        case "rand":
-            align_state = MovingState.rand_dir_turn(controller, conf.stage_align_speed)
-        case "l":
-            align_state = MovingState.turn("l", conf.stage_align_speed)
-        case "r":
-            align_state = MovingState.turn("r", conf.stage_align_speed)
-        case _:
-            raise ValueError(f"Invalid align direction: {conf.stage_align_direction}")
+    align_state = _make_align_state(conf.stage_align_direction, conf.stage_align_speed)
 
     align_stage_transition = MovingTransition(
         conf.max_stage_align_duration, breaker=align_stage_breaker, to_states={False: rand_move_head_state}
@@ -1160,60 +1018,43 @@ def make_fence_handler(
     case_reg = CaseRegistry(FenceCodeSign)
 
     # ---------------------------------------------------------------------
-    [head_state, *_], transitions = composer.init_container().concat(*back_stage_pack).export_structure()
+    # the packs below are registered as they are, concatenating them into an empty container only copies them
+    head_state, transitions = back_stage_pack[0][0], back_stage_pack[1]
     transitions_pool.extend(transitions)
     case_reg.register(FenceCodeSign.X_O_O_O, head_state)
 
     # ---------------------------------------------------------------------
-    [head_state, *_], transitions = (
+    states, transitions = (
         composer.init_container()
-        .add(align_state.clone())
-        .add(align_stage_transition.clone())
+        .add(align_state)
+        .add(align_stage_transition)
         .concat(*back_stage_pack, register_case=True)  # back to stage only when the check is passed
         .export_structure()
     )
+    head_state = states[0]
 
     transitions_pool.extend(transitions)
-    case_reg.batch_register(
-        [
-            FenceCodeSign.O_X_O_O,
-            FenceCodeSign.O_O_X_O,
-            FenceCodeSign.O_O_O_X,
-            FenceCodeSign.O_O_X_X,
-            FenceCodeSign.X_X_O_O,
-        ],
-        head_state,
-    )
+    case_reg.batch_register(_FENCE_ALIGN_STAGE_CODES, head_state)
     # ---------------------------------------------------------------------
-    [head_state, *_], transitions = (
-        composer.init_container()
-        .add(front_exit_corner_state.clone())
-        .add(exit_duration.clone())
-        .add(stop_state)
-        .export_structure()
-    )
+    # both corner exits lead to the stop state, so they share the same transition.
+    # botix only requires a state to leave through one transition, while a transition may start from several states.
+    states, transitions = _build_chain(front_exit_corner_state, exit_duration, stop_state)
+    head_state = states[0]
     transitions_pool.extend(transitions)
-    case_reg.batch_register([FenceCodeSign.O_X_O_X, FenceCodeSign.O_X_X_O], head_state)
+    case_reg.batch_register(_FENCE_FRONT_EXIT_CODES, head_state)
     # ---------------------------------------------------------------------
-    [head_state, *_], transitions = (
-        composer.init_container()
-        .add(rear_exit_corner_state.clone())
-        .add(exit_duration.clone())
-        .add(stop_state)
-        .export_structure()
-    )
+    states, transitions = _build_chain(rear_exit_corner_state, exit_duration, stop_state)
+    head_state = states[0]
     transitions_pool.extend(transitions)
-    case_reg.batch_register([FenceCodeSign.X_O_O_X, FenceCodeSign.X_O_X_O], head_state)
+    case_reg.batch_register(_FENCE_REAR_EXIT_CODES, head_state)
     # ---------------------------------------------------------------------
-    [head_state, *_], transitions = composer.init_container().concat(*align_direction_pack).export_structure()
+    head_state, transitions = align_direction_pack[0][0], align_direction_pack[1]
     transitions_pool.extend(transitions)
-    case_reg.batch_register(
-        [FenceCodeSign.O_X_X_X, FenceCodeSign.X_O_X_X, FenceCodeSign.X_X_O_X, FenceCodeSign.X_X_X_O], head_state
-    )
+    case_reg.batch_register(_FENCE_ALIGN_DIRECTION_CODES, head_state)
     # ---------------------------------------------------------------------
-    [head_state, *_], transitions = composer.init_container().concat(*rand_move_pack).export_structure()
+    head_state, transitions = rand_move_pack[0][0], rand_move_pack[1]
     transitions_pool.extend(transitions)
-    case_reg.batch_register([FenceCodeSign.O_O_O_O, FenceCodeSign.X_X_X_X], head_state)
+    case_reg.batch_register(_FENCE_RAND_MOVE_CODES, head_state)
     # ---------------------------------------------------------------------
 
     (
@@ -1222,18 +1063,17 @@ def make_fence_handler(
         else None
     )
     # <editor-fold desc="Assembly">
-    _, head_trans = (
-        composer.init_container()
-        .add(start_state)
-        .add(MovingTransition(run_config.perf.checking_duration, breaker=fence_breaker, to_states=case_reg.export()))
-        .export_structure()
+    _, head_trans = _build_chain(
+        start_state,
+        MovingTransition(run_config.perf.checking_duration, breaker=fence_breaker, to_states=case_reg.export()),
     )
     # </editor-fold>
 
     # <editor-fold desc="Make Return">
     transitions_pool.extend(head_trans)
 
-    return start_state, stop_state, list(set(transitions_pool))
+    # the back stage transitions are concatenated more than once, drop the duplicates while keeping the order
+    return start_state, stop_state, list(dict.fromkeys(transitions_pool))
     # </editor-fold>
 
 
@@ -1261,20 +1101,12 @@ def make_align_direction_handler(
 
     conf = run_config.fence
 
-    match conf.direction_align_direction:
-        case "rand":
-            align_state = MovingState.rand_dir_turn(controller, conf.direction_align_speed)
-        case "l":
-            align_state = MovingState.turn("l", conf.direction_align_speed)
-        case "r":
-            align_state = MovingState.turn("r", conf.direction_align_speed)
-        case _:
-            raise ValueError(f"Invalid align direction: {conf.direction_align_direction}")
-    align_direction_breaker = (
-        Breakers.make_align_direction_breaker_mpu(app_config, run_config)
-        if run_config.fence.use_mpu_align_direction and any([_logger.info("Using MPU to align direction"), True])
-        else Breakers.make_std_align_direction_breaker(app_config, run_config)
-    )
+    align_state = _make_align_state(conf.direction_align_direction, conf.direction_align_speed)
+    if run_config.fence.use_mpu_align_direction:
+        _logger.info("Using MPU to align direction")
+        align_direction_breaker = Breakers.make_align_direction_breaker_mpu(app_config, run_config)
+    else:
+        align_direction_breaker = Breakers.make_std_align_direction_breaker(app_config, run_config)
     if aligned_state and not_aligned_state:
         branch = {True: aligned_state, False: not_aligned_state}
     elif aligned_state:
@@ -1289,8 +1121,7 @@ def make_align_direction_handler(
         to_states=branch,
     )
 
-    composer.init_container().add(align_state).add(align_direction_transition)
-    return composer.export_structure()
+    return _build_chain(align_state, align_direction_transition)
 
 
 def make_back_to_stage_handler(
@@ -1346,7 +1177,7 @@ def make_back_to_stage_handler(
         dash_trans = MovingTransition(run_config.backstage.dash_duration)
         (composer.add(dash_trans))
 
-    composer.add(MovingState.halt(), register_case=True).add(stab_trans.clone())
+    composer.add(MovingState.halt(), register_case=True).add(stab_trans)
 
     # turn_section
     main_branch_states, main_branch_transitions = (
@@ -1402,55 +1233,36 @@ def make_reboot_handler(
     """
     end_state = end_state or MovingState.halt()
 
-    activation_breaker = menta.construct_inlined_function(
-        usages=[
-            SamplerUsage(
-                used_sampler_index=SamplerIndexes.adc_all,
-                required_data_indexes=[app_config.sensor.left_adc_index, app_config.sensor.right_adc_index],
-            )
-        ],
-        judging_source=f"ret=s0>{run_config.boot.left_threshold} and s1>{run_config.boot.right_threshold}",
-        return_type=bool,
-        return_raw=False,
-        function_name="reboot_breaker",
-    )
+    activation_breaker = Breakers.make_reboot_activation_breaker(app_config, run_config)
 
     holding_transition = MovingTransition(run_config.boot.max_holding_duration, breaker=activation_breaker)
     # waiting for a booting signal, and dash on to the stage once received
-    states, transitions = (
-        composer.init_container()
-        .add(
-            MovingState(
-                0,
-                before_entering=(
-                    [sig_light_registry.register_singles("Reboot|Start rebooting", Color.G_RED, Color.R_GREEN)]
-                    if app_config.debug.use_siglight
-                    else []
-                ),
-            )
-        )
-        .add(holding_transition)
-        .add(
-            MovingState(
-                -run_config.boot.dash_speed,
-                after_exiting=(
-                    [sig_light_registry.register_singles("Reboot|In rebooting", Color.DARKBLUE, Color.DARKGREEN)]
-                    if app_config.debug.use_siglight
-                    else []
-                ),
-            )
-        )
-        .add(MovingTransition(run_config.boot.dash_duration))
-        .add(MovingState.halt())
-        .add(MovingTransition(run_config.boot.time_to_stabilize))
-        .add(
-            MovingState.rand_dir_turn(
-                controller, run_config.boot.turn_speed, turn_left_prob=run_config.boot.turn_left_prob
-            )
-        )
-        .add(MovingTransition(run_config.boot.full_turn_duration))
-        .add(end_state)
-        .export_structure()
+    states, transitions = _build_chain(
+        MovingState(
+            0,
+            before_entering=(
+                [sig_light_registry.register_singles("Reboot|Start rebooting", Color.G_RED, Color.R_GREEN)]
+                if app_config.debug.use_siglight
+                else []
+            ),
+        ),
+        holding_transition,
+        MovingState(
+            -run_config.boot.dash_speed,
+            after_exiting=(
+                [sig_light_registry.register_singles("Reboot|In rebooting", Color.DARKBLUE, Color.DARKGREEN)]
+                if app_config.debug.use_siglight
+                else []
+            ),
+        ),
+        MovingTransition(run_config.boot.dash_duration),
+        MovingState.halt(),
+        MovingTransition(run_config.boot.time_to_stabilize),
+        MovingState.rand_dir_turn(
+            controller, run_config.boot.turn_speed, turn_left_prob=run_config.boot.turn_left_prob
+        ),
+        MovingTransition(run_config.boot.full_turn_duration),
+        end_state,
     )
 
     return states, transitions
@@ -1488,13 +1300,13 @@ def make_rand_walk_handler(
     moves_seq = []
     weights = []
     if conf.use_turn:
-        for left_turn_spd, w in zip(conf.rand_turn_speeds, conf.rand_turn_speed_weights):
-            moves_seq.append((-left_turn_spd, -left_turn_spd, left_turn_spd, left_turn_spd))
-            weights.append(w * conf.turn_weight)
+        turn_pack = tuple(zip(conf.rand_turn_speeds, conf.rand_turn_speed_weights))
+        moves_seq.extend((-spd, -spd, spd, spd) for spd, _ in turn_pack)
+        weights.extend(w * conf.turn_weight for _, w in turn_pack)
     if conf.use_straight:
-        for straight_spd, w in zip(conf.rand_straight_speeds, conf.rand_straight_speed_weights):
-            moves_seq.append((straight_spd, straight_spd, straight_spd, straight_spd))
-            weights.append(w * conf.straight_weight)
+        straight_pack = tuple(zip(conf.rand_straight_speeds, conf.rand_straight_speed_weights))
+        moves_seq.extend(_broadcast_speed(spd) for spd, _ in straight_pack)
+        weights.extend(w * conf.straight_weight for _, w in straight_pack)
 
     rand_move_state = MovingState.rand_move(controller, moves_seq, weights)
     (
@@ -1504,7 +1316,7 @@ def make_rand_walk_handler(
     )
 
     move_transition = MovingTransition(conf.walk_duration)
-    return composer.init_container().add(rand_move_state).add(move_transition).add(end_state).export_structure()
+    return _build_chain(rand_move_state, move_transition, end_state)
 
 
 def make_std_battle_handler(
@@ -1532,7 +1344,7 @@ def make_std_battle_handler(
     reboot_states_pack, reboot_transitions_pack = make_reboot_handler(
         app_config, run_config, end_state=end_state.clone()
     )
-    [reboot_start_state, *_] = reboot_states_pack
+    reboot_start_state = reboot_states_pack[0]
     fence_start_state, _, fence_pack = make_fence_handler(app_config, run_config, stop_state=end_state.clone())
     on_stage_start_state, stage_pack = make_on_stage_handler(
         app_config,
@@ -1543,7 +1355,7 @@ def make_std_battle_handler(
     unclear_zone_start_state,_,unclear_zone_pack = make_unclear_zone_handler(app_config, run_config,normal_exit=end_state.clone())
 
     case_reg = CaseRegistry(StageCodeSign)
-    transition_pool = [*reboot_transitions_pack, *fence_pack, *stage_pack,*unclear_zone_pack]
+    transition_pool = list(chain(reboot_transitions_pack, fence_pack, stage_pack, unclear_zone_pack))
 
     (
         case_reg.batch_register(
@@ -1559,7 +1371,7 @@ def make_std_battle_handler(
         run_config.perf.checking_duration, breaker=stage_breaker, to_states=case_reg.export()
     )
 
-    _, trans = composer.init_container().add(start_state).add(check_trans).export_structure()
+    _, trans = _build_chain(start_state, check_trans)
     transition_pool.extend(trans)
     return start_state, end_state, transition_pool
 
@@ -1645,7 +1457,7 @@ def make_always_on_stage_battle_handler(
         run_config.perf.checking_duration, breaker=stage_breaker, to_states=on_stage_start_state
     )
 
-    _, trans = composer.init_container().add(start_state).add(check_trans).export_structure()
+    _, trans = _build_chain(start_state, check_trans)
     transition_pool.extend(trans)
     return start_state, end_state, transition_pool
 
@@ -1675,7 +1487,7 @@ def make_always_off_stage_battle_handler(
     reboot_pack = make_reboot_handler(app_config, run_config, end_state=end_state)
     fence_pack = make_fence_handler(app_config, run_config, stop_state=end_state)
 
-    transition_pool = [*reboot_pack[-1], *fence_pack[-1]]
+    transition_pool = list(chain(reboot_pack[-1], fence_pack[-1]))
 
     check_trans = MovingTransition(
         run_config.perf.checking_duration,
@@ -1683,7 +1495,7 @@ def make_always_off_stage_battle_handler(
         to_states={StageCodeSign.OFF_STAGE: fence_pack[0], StageCodeSign.OFF_STAGE_REBOOT: reboot_pack[0][0]},
     )
 
-    _, trans = composer.init_container().add(start_state).add(check_trans).export_structure()
+    _, trans = _build_chain(start_state, check_trans)
     transition_pool.extend(trans)
     return start_state, end_state, transition_pool
 
@@ -1699,14 +1511,31 @@ def make_salvo_end_state() -> MovingState:
         MovingState: 一个配置了速度重置执行器的移动状态，用于循环轮结束时的状态转换。
     """
     end_state: MovingState = MovingState.halt()
-    zero_salvo_speed_updater = controller.register_context_executor(
-        lambda: (0, 0, 0, 0), output_keys=[ContextVar.prev_salvo_speed.name], function_name="zero_salvo_speed_updater"
+    zero_salvo_speed_updater = _context_executor(
+        _zero_salvo_speed_updater, output_keys=(_PREV_SALVO_SPEED_KEY,), function_name="zero_salvo_speed_updater"
     )
     end_state.before_entering.append(zero_salvo_speed_updater)
     return end_state
 
 
 
+@lru_cache(maxsize=None)
+def _make_unclear_zone_gray_getter(app_config: APPConfig) -> Callable[[], int]:
+    """
+    Build the gray value getter of the unclear zone, cached so that its context executor is registered only once.
+    """
+    return menta.construct_inlined_function(
+        usages=[
+            SamplerUsage(
+                used_sampler_index=SamplerIndexes.adc_all, required_data_indexes=[app_config.sensor.gray_adc_index]
+            )
+        ],  # Specify ADC sample index
+        judging_source="ret=s0",  # Gray value stored in s0
+        return_type=int,
+        function_name="get_unclear_zone_gray",
+    )
+
+
 def make_unclear_zone_handler(
         app_config: APPConfig,
         run_config: RunConfig,
@@ -1734,21 +1563,15 @@ def make_unclear_zone_handler(
     # Create the normal exit state: halt movement
     normal_exit = normal_exit or MovingState.halt()
 
-    # Register context executor to update gray value
-    updater = controller.register_context_executor(
-        menta.construct_inlined_function(
-            usages=[SamplerUsage(used_sampler_index=SamplerIndexes.adc_all,
-                                required_data_indexes=[app_config.sensor.gray_adc_index])],  # Specify ADC sample index
-            judging_source="ret=s0",  # Gray value stored in s0
-            return_type=int,
-            function_name="get_unclear_zone_gray"
-        ),
-        output_keys=[ContextVar.unclear_zone_gray.name],
+    # Register context executor to update gray value, shared by the rebuilds like the other executors
+    updater = _context_executor(
+        _make_unclear_zone_gray_getter(app_config),
+        output_keys=(_UNCLEAR_ZONE_GRAY_KEY,),
         function_name="update_unclear_zone_gray"
     )
 
     # Register context getter for gray value
-    getter = controller.register_context_getter(ContextVar.unclear_zone_gray.name)
+    getter = controller.register_context_getter(_UNCLEAR_ZONE_GRAY_KEY)
 
     # Construct function to judge if in unclear zone
     judge = menta.construct_inlined_function(
@@ -8,7 +8,7 @@ from kazu.config import APPConfig, RunConfig, ContextVar, TagGroup
 from kazu.constant import EdgeWeights, Attitude, ScanWeights, StageWeight, SurroundingWeights, FenceWeights, Axis
 from kazu.hardwares import controller, menta, SamplerIndexes, tag_detector
 from kazu.logger import _logger
-from kazu.static import make_query_table
+from kazu.static import make_query_table, fold_edge_thresholds
 
 
 class Breakers:
@@ -25,10 +25,13 @@ class Breakers:
 
         Returns:
         An inlined function that assesses the braking state of the rear wheels based on sensor data.
+
+        Notes:
+            the edge thresholds are folded into int literals, which assumes integer ADC readings,
+            see fold_edge_thresholds.
         """
         # Retrieve lower and upper threshold sequences
-        lt_seq = run_config.edge.lower_threshold
-        ut_seq = run_config.edge.upper_threshold
+        lt_seq, ut_seq = fold_edge_thresholds(run_config.edge.lower_threshold, run_config.edge.upper_threshold)
 
         # Constructs and returns an inlined function to judge the rear brake status
         # The function leverages the ADC for all channels and focuses on specific sensor indices
@@ -61,9 +64,12 @@ class Breakers:
 
         Returns:
         An inlined function that assesses the braking state of the rear wheels based on sensor data.
+
+        Notes:
+            the edge thresholds are folded into int literals, which assumes integer ADC readings,
+            see fold_edge_thresholds.
         """
-        lt_seq = run_config.edge.lower_threshold
-        ut_seq = run_config.edge.upper_threshold
+        lt_seq, ut_seq = fold_edge_thresholds(run_config.edge.lower_threshold, run_config.edge.upper_threshold)
         activate = run_config.stage.gray_io_off_stage_case_value
         return menta.construct_inlined_function(
             usages=[
@@ -100,9 +106,12 @@ class Breakers:
 
         Returns:
         An inlined function that assesses the braking state of the rear wheels based on sensor data.
+
+        Notes:
+            the edge thresholds are folded into int literals, which assumes integer ADC readings,
+            see fold_edge_thresholds.
         """
-        lt_seq = run_config.edge.lower_threshold
-        ut_seq = run_config.edge.upper_threshold
+        lt_seq, ut_seq = fold_edge_thresholds(run_config.edge.lower_threshold, run_config.edge.upper_threshold)
         if run_config.edge.use_gray_io:
             _logger.info("Using gray io for edge full detection")
             fl_lt, rl_lt, rr_lt, fr_lt = lt_seq
@@ -113,21 +122,20 @@ class Breakers:
 
             activate = run_config.stage.gray_io_off_stage_case_value
             source = [
-                f"ret=sum(["
-                f"(s{fl_id}<{fl_lt} or s{fl_id}>{fl_ut} or s4=={activate} )*{fl_wt}, "
-                f"(s{rl_id}<{rl_lt} or s{rl_id}>{rl_ut})*{rl_wt}, "
-                f"(s{rr_id}<{rr_lt} or s{rr_id}>{rr_ut})*{rr_wt}, "
+                f"ret="
+                f"(s{fl_id}<{fl_lt} or s{fl_id}>{fl_ut} or s4=={activate} )*{fl_wt}+"
+                f"(s{rl_id}<{rl_lt} or s{rl_id}>{rl_ut})*{rl_wt}+"
+                f"(s{rr_id}<{rr_lt} or s{rr_id}>{rr_ut})*{rr_wt}+"
                 f"(s{fr_id}<{fr_lt} or s{fr_id}>{fr_ut} or s5=={activate})*{fr_wt}"
-                f"])"
             ]
         else:
+            # plain additions, avoid building a list and calling sum() on every tick
             source = [
-                "ret=sum(["
-                + ",".join(
+                "ret="
+                + "+".join(
                     f"({lt}>s{s_id} or {ut}<s{s_id})*{wt}"
                     for s_id, lt, ut, wt in zip(range(4), lt_seq, ut_seq, EdgeWeights.export_std_weight_seq())
                 )
-                + "])"
             ]
         ctx = {}
         if app_config.debug.log_level == "DEBUG":
@@ -167,6 +175,26 @@ class Breakers:
             function_name="std_edge_full_breaker",
         )
 
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def make_std_edge_full_bool_breaker(app_config: APPConfig, run_config: RunConfig) -> Callable[[], bool]:
+        """
+        Constructs a boolean version of the standard edge full breaker, which tells whether any edge is detected.
+
+        Parameters:
+        - app_config: Configuration object for the application, holding sensor indices among other settings.
+        - run_config: Configuration object for the runtime, including threshold values.
+
+        Returns:
+        A function that returns True if any edge is detected, shared across all the handlers using the same configs.
+        """
+        edge_full_breaker = Breakers.make_std_edge_full_breaker(app_config, run_config)
+
+        def std_edge_full_bool_breaker() -> bool:
+            return bool(edge_full_breaker())
+
+        return std_edge_full_bool_breaker
+
     @staticmethod
     @lru_cache(maxsize=None)
     def make_std_turn_to_front_breaker(app_config: APPConfig, run_config: RunConfig) -> Callable[[], bool]:
@@ -282,13 +310,16 @@ class Breakers:
         An inlined function that assesses the braking state of the rear wheels based on sensor data.
 
         Notes:
-            edge detection uses both the gray_io on the shovel and the edge sensors on the shovel arm
+            edge detection uses both the gray_io on the shovel and the edge sensors on the shovel arm,
+            the edge lower thresholds are folded into int literals, which assumes integer ADC readings,
+            see fold_edge_thresholds.
         """
         off_stage_activate = run_config.stage.gray_io_off_stage_case_value
         surr_obj_activate = run_config.surrounding.io_encounter_object_value
 
-        fl_lower_threshold = run_config.edge.lower_threshold[0]
-        fr_lower_threshold = run_config.edge.lower_threshold[-1]
+        lt_seq, _ = fold_edge_thresholds(run_config.edge.lower_threshold, run_config.edge.upper_threshold)
+        fl_lower_threshold = lt_seq[0]
+        fr_lower_threshold = lt_seq[-1]
 
         return menta.construct_inlined_function(
             usages=[
@@ -821,21 +852,25 @@ class Breakers:
         # 从运行配置中获取IO相遇对象的值
         activate: int = conf.io_encounter_object_value
 
+        # 前方是否被阻挡，作为查询表格的索引
+        front_blocked_source: str = f"(s0=={activate} or s1=={activate} or s4>{conf.front_adc_lower_threshold})"
         if app_config.vision.use_camera:
-            # 使用摄像头时，定义标签来源为检测到的标签ID
-            get_id_source: str = "tag_d.tag_id"
+            # 使用摄像头时，以前方是否被阻挡作为索引，按检测到的标签ID查表
+            front_source: str = f"q_tb[{front_blocked_source}].get(tag_d.tag_id)"
             # 设置上下文，包含标签检测器和查询表格
             ctx = {"tag_d": tag_detector, "q_tb": query_table}
         else:
-            # 不使用摄像头时，定义标签来源为默认标签
-            get_id_source: str = f"{tag_group.default_tag}"
-            # 设置上下文，只包含查询表格
-            ctx = {"q_tb": query_table}
+            # 不使用摄像头时，标签恒为默认标签，直接将查表结果折叠为字面量
+            front_source: str = (
+                f"({query_table[True][tag_group.default_tag]} if {front_blocked_source} "
+                f"else {query_table[False][tag_group.default_tag]})"
+            )
+            ctx = {}
 
         # 构建判断周围环境状况的逻辑表达式
         source = [
             (
-                f"ret=q_tb.get(({get_id_source}, bool(s0=={activate} or s1=={activate} or s4>{conf.front_adc_lower_threshold})))"
+                f"ret={front_source}"
                 f"+(s5>{conf.left_adc_lower_threshold})*{SurroundingWeights.LEFT_OBJECT}"
                 f"+(s6>{conf.right_adc_lower_threshold})*{SurroundingWeights.RIGHT_OBJECT}"
                 f"+(s2=={activate} or s3=={activate} or s7>{conf.back_adc_lower_threshold})*{SurroundingWeights.BEHIND_OBJECT}"
@@ -917,6 +952,32 @@ class Breakers:
             function_name="reboot_button_pressed_breaker",
         )
 
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def make_reboot_activation_breaker(app_config: APPConfig, run_config: RunConfig) -> Callable[[], bool]:
+        """
+        Generates a function that acts as a breaker for the reboot activation, i.e. both sides are blocked.
+
+        Args:
+            app_config (APPConfig): The application configuration.
+            run_config (RunConfig): The run configuration.
+
+        Returns:
+            Callable[[], bool]: A function that returns True if both left and right ADC exceed the boot thresholds.
+        """
+        return menta.construct_inlined_function(
+            usages=[
+                SamplerUsage(
+                    used_sampler_index=SamplerIndexes.adc_all,
+                    required_data_indexes=[app_config.sensor.left_adc_index, app_config.sensor.right_adc_index],
+                )
+            ],
+            judging_source=f"ret=s0>{run_config.boot.left_threshold} and s1>{run_config.boot.right_threshold}",
+            return_type=bool,
+            return_raw=False,
+            function_name="reboot_breaker",
+        )
+
     @staticmethod
     @lru_cache(maxsize=None)
     def make_check_gray_adc_for_scan_breaker(app_config: APPConfig, run_config: RunConfig) -> Callable[[], bool]:
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from types import MappingProxyType
 from typing import TypeAlias, Callable, Dict, Tuple, Optional, Self
 
@@ -25,6 +26,30 @@ def set_all_black():
     set_all(__black__)
 
 
+@lru_cache(maxsize=None)
+def _make_all_setter(color: Color) -> ColorSetter:
+    """
+    Generate the setter that sets all the leds to the same color, cached since it only depends on the color.
+    """
+    func_name = f"set_all_leds_{color.name}"
+    source = f"def {func_name}()->None:\n    set_all({color.value})"
+
+    exec(source, ctx := {"set_all": set_all})
+    return ctx.get(func_name)
+
+
+@lru_cache(maxsize=None)
+def _make_singles_setter(color_0: Color, color_1: Color) -> ColorSetter:
+    """
+    Generate the setter that sets the two leds to their own colors, cached since it only depends on the colors.
+    """
+    func_name = f"set_leds_{color_0.name}_{color_1.name}"
+    source = f"def {func_name}()->None:\n    set_all_single({color_0.value}, {color_1.value})"
+
+    exec(source, ctx := {"set_all_single": set_all_single})
+    return ctx.get(func_name)
+
+
 class SigLightRegistry(object):
     """
     A registry class for managing signal light purposes associated with color combinations.
@@ -105,12 +130,7 @@ class SigLightRegistry(object):
             ColorSetter: A function to set all lights to the specified color.
         """
         self._register((color, color), purpose)
-        value = color.value
-        func_name = f"set_all_leds_{color.name}"
-        source = f"def {func_name}()->None:\n    set_all({value})"
-
-        exec(source, ctx := {"set_all": set_all})
-        return ctx.get(func_name)
+        return _make_all_setter(color)
 
     def register_singles(self, purpose: str, color_0: Color, color_1: Color) -> ColorSetter:
         """
@@ -126,13 +146,7 @@ class SigLightRegistry(object):
             ColorSetter: A function to set lights to the specified individual color values.
         """
         self._register((color_0, color_1), purpose)
-        value_0 = color_0.value
-        value_1 = color_1.value
-        func_name = f"set_leds_{color_0.name}_{color_1.name}"
-        source = f"def {func_name}()->None:\n    set_all_single({value_0}, {value_1})"
-
-        exec(source, ctx := {"set_all_single": set_all_single})
-        return ctx.get(func_name)
+        return _make_singles_setter(color_0, color_1)
 
     @property
     def usage_table(self) -> str:
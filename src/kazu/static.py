@@ -1,5 +1,6 @@
+from math import ceil, floor
 from socket import socket, AF_INET, SOCK_DGRAM
-from typing import Dict, Tuple
+from typing import Dict, Tuple, Sequence
 
 from mentabotix import MovingState
 
@@ -13,27 +14,54 @@ continues_state = MovingState(
 )
 
 
-def make_query_table(tag_group: TagGroup) -> Dict[Tuple[int, bool], int]:
+def make_query_table(tag_group: TagGroup) -> Tuple[Dict[int, int], Dict[int, int]]:
     """
+    Make the query table used by the surrounding breaker.
 
+    Args:
+        tag_group (TagGroup): the tag group of the current team.
+
+    Returns:
+        Tuple[Dict[int, int], Dict[int, int]]: a pair of tag-to-weight tables, indexed by whether the front is blocked,
+        so the breaker can look up with a bool index instead of building a tuple key on every tick.
+    """
+    query_table: Tuple[Dict[int, int], Dict[int, int]] = (
+        {
+            tag_group.default_tag: SurroundingWeights.NOTHING,
+            tag_group.allay_tag: SurroundingWeights.FRONT_ALLY_BOX,
+            tag_group.neutral_tag: SurroundingWeights.NOTHING,
+            tag_group.enemy_tag: SurroundingWeights.FRONT_ENEMY_BOX,
+        },
+        {
+            tag_group.default_tag: SurroundingWeights.FRONT_ENEMY_CAR,
+            tag_group.allay_tag: SurroundingWeights.FRONT_ALLY_BOX,
+            tag_group.neutral_tag: SurroundingWeights.FRONT_NEUTRAL_BOX,
+            tag_group.enemy_tag: SurroundingWeights.FRONT_ENEMY_BOX,
+        },
+    )
+    return query_table
+
+
+def fold_edge_thresholds(
+    lower_threshold: Sequence[float], upper_threshold: Sequence[float]
+) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """
+    Fold the edge thresholds into int literals for the generated edge breakers.
 
     Args:
-        tag_group (TagGroup):
+        lower_threshold (Sequence[float]): the lower thresholds, a reading below it is considered off the stage.
+        upper_threshold (Sequence[float]): the upper thresholds, a reading above it is considered off the stage.
 
     Returns:
+        Tuple[Tuple[int, ...], Tuple[int, ...]]: the lower thresholds rounded up and the upper thresholds rounded down.
 
+    Notes:
+        This relies on the edge sensors being sampled as integer ADC readings. For any int reading r,
+        ``lower > r`` equals ``ceil(lower) > r`` and ``r > upper`` equals ``r > floor(upper)``,
+        so the folded comparisons are exact. A non-integer reading could land between a fractional threshold
+        and its rounded value and be judged differently.
     """
-    query_table: Dict[Tuple[int, bool], int] = {
-        (tag_group.default_tag, True): SurroundingWeights.FRONT_ENEMY_CAR,
-        (tag_group.default_tag, False): SurroundingWeights.NOTHING,
-        (tag_group.allay_tag, True): SurroundingWeights.FRONT_ALLY_BOX,
-        (tag_group.allay_tag, False): SurroundingWeights.FRONT_ALLY_BOX,
-        (tag_group.neutral_tag, True): SurroundingWeights.FRONT_NEUTRAL_BOX,
-        (tag_group.neutral_tag, False): SurroundingWeights.NOTHING,
-        (tag_group.enemy_tag, True): SurroundingWeights.FRONT_ENEMY_BOX,
-        (tag_group.enemy_tag, False): SurroundingWeights.FRONT_ENEMY_BOX,
-    }
-    return query_table
+    return tuple(map(ceil, lower_threshold)), tuple(map(floor, upper_threshold))
 
 
 def get_local_ip() -> str | None:
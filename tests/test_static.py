@@ -0,0 +1,54 @@
+from math import ceil, floor
+
+import pytest
+
+pytest.importorskip("mentabotix")
+pytest.importorskip("upic")
+
+from kazu.config import TagGroup  # noqa: E402
+from kazu.constant import SurroundingWeights  # noqa: E402
+from kazu.static import make_query_table, fold_edge_thresholds  # noqa: E402
+
+
+def _legacy_query_table(tag_group: TagGroup):
+    """
+    The (tag, front_blocked) keyed table that make_query_table used to return.
+    """
+    return {
+        (tag_group.default_tag, True): SurroundingWeights.FRONT_ENEMY_CAR,
+        (tag_group.default_tag, False): SurroundingWeights.NOTHING,
+        (tag_group.allay_tag, True): SurroundingWeights.FRONT_ALLY_BOX,
+        (tag_group.allay_tag, False): SurroundingWeights.FRONT_ALLY_BOX,
+        (tag_group.neutral_tag, True): SurroundingWeights.FRONT_NEUTRAL_BOX,
+        (tag_group.neutral_tag, False): SurroundingWeights.NOTHING,
+        (tag_group.enemy_tag, True): SurroundingWeights.FRONT_ENEMY_BOX,
+        (tag_group.enemy_tag, False): SurroundingWeights.FRONT_ENEMY_BOX,
+    }
+
+
+@pytest.mark.parametrize("team_color", ["yellow", "blue"])
+def test_query_table_matches_legacy_lookup(team_color):
+    tag_group = TagGroup(team_color=team_color)
+    legacy = _legacy_query_table(tag_group)
+    table = make_query_table(tag_group)
+
+    tags = (tag_group.default_tag, tag_group.allay_tag, tag_group.neutral_tag, tag_group.enemy_tag)
+    for front_blocked in (False, True):
+        assert set(table[front_blocked]) == set(tags)
+        for tag in tags:
+            assert table[front_blocked][tag] == legacy[(tag, front_blocked)]
+
+
+@pytest.mark.parametrize("fraction", [0.0, 0.25, 0.5, 0.75])
+def test_folded_edge_thresholds_match_float_comparisons(fraction):
+    lower_threshold = tuple(t + fraction for t in (1740, 1819, 1819, 1740))
+    upper_threshold = tuple(t + fraction for t in (2100, 2200, 2200, 2100))
+    lt_seq, ut_seq = fold_edge_thresholds(lower_threshold, upper_threshold)
+
+    assert all(isinstance(t, int) for t in lt_seq + ut_seq)
+    for lower, upper, lt, ut in zip(lower_threshold, upper_threshold, lt_seq, ut_seq):
+        # every integer ADC reading within lower/upper +- 0.5, plus one on each side
+        for reading in range(floor(lower - 0.5) - 1, ceil(lower + 0.5) + 2):
+            assert (lt > reading) == (lower > reading)
+        for reading in range(floor(upper - 0.5) - 1, ceil(upper + 0.5) + 2):
+            assert (reading > ut) == (reading > upper)